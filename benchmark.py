@@ -0,0 +1,209 @@
+import argparse
+import csv
+import json
+import time
+
+import numpy as np
+
+from chain import chain_matrix, tridiagonal_sturm
+from eigensolver import clear_cache, harmonic_matrices, qu_converge, shifted_qr, solve_eigenvalues_batched
+
+# Benchmarks each eigen-solver against np.linalg.eigvals for speed and accuracy.
+# Runs without any prompts or plots, so it can be used for regression tracking, e.g.
+#   python benchmark.py --sizes 2 8 32 128 --json bench.json --csv bench.csv
+# Long uniform chains (--chain-sizes) are too big for a dense reference, so they are checked against
+# their exact eigenvalues instead.
+
+# seconds is per matrix; batch is how many matrices were solved in each timed call
+FIELDS = ["kind", "size", "solver", "batch", "seconds", "max_error", "iterations", "residual", "converged"]
+
+
+def make_matrices(kind: str, size: int, count: int, rng: np.random.Generator):
+    """
+    Generates a stack of test matrices.
+    :param kind: "symmetric", "non-symmetric", "chain" (random masses and springs, fixed ends, in the
+                 symmetrised form chain.py solves) or "harmonic" (the same chains in the non-symmetric form
+                 -M^-1 K that main.py and sweep.py solve - harmonic_matrices() itself for size 2)
+    :param size: Number of rows of each matrix
+    :param count: Number of matrices in the stack
+    :param rng: Random number generator to draw from
+    :return: Stack of shape (count, size, size)
+    """
+    if kind == "symmetric":
+        matrices = rng.standard_normal((count, size, size))
+        return matrices + np.transpose(matrices, (0, 2, 1))
+    if kind == "non-symmetric":
+        return rng.standard_normal((count, size, size))
+    if kind == "chain":
+        matrices = np.zeros((count, size, size))
+        for matrix in matrices:
+            diagonal, off_diagonal = chain_matrix(rng.uniform(0.5, 2.0, size), rng.uniform(0.5, 2.0, size + 1))
+            matrix += np.diag(diagonal) + np.diag(off_diagonal, 1) + np.diag(off_diagonal, -1)
+        return matrices
+    if kind == "harmonic":
+        if size == 2:
+            return harmonic_matrices(rng.uniform(0.5, 2.0, count), rng.uniform(0.5, 2.0, count),
+                                     rng.uniform(0.5, 2.0, count))
+        matrices = np.zeros((count, size, size))
+        for matrix in matrices:
+            masses, springs = rng.uniform(0.5, 2.0, size), rng.uniform(0.5, 2.0, size + 1)
+            # Stiffness matrix K of the chain, scaled row by row by 1/m
+            stiffness = np.diag(springs[:-1] + springs[1:]) - np.diag(springs[1:-1], 1) - np.diag(springs[1:-1], -1)
+            matrix -= stiffness / masses[:, None]
+        return matrices
+    raise ValueError(f"Unknown matrix kind '{kind}'")
+
+
+def max_error(eigenvalues, reference) -> float:
+    """
+    Largest distance between the computed and reference eigenvalues, matching each one to its nearest
+    neighbour in the other set (both ways round), so ordering and complex pairs don't matter.
+    """
+    distances = np.abs(np.asarray(eigenvalues)[:, None] - np.asarray(reference)[None, :])
+    return float(max(distances.min(axis=0).max(), distances.min(axis=1).max()))
+
+
+def accurate(error: float, reference, tolerance: float) -> bool:
+    """
+    Whether eigenvalues are within tolerance of the reference, relative to its largest eigenvalue.
+    Judged on the actual error rather than the solver's residual, which can be small while the
+    eigenvalues are still off (e.g. the QU algorithm's 5 d.p. rounding).
+    """
+    return bool(error <= tolerance * np.abs(reference).max())
+
+
+def time_solver(solve, repeat: int):
+    """
+    Runs a solver `repeat` times and keeps the fastest time.
+    :return: The solver's result, and the best time in seconds
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = solve()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def benchmark(sizes, kinds, batch: int, repeat: int, tolerance: float, max_iterations: int,
+              batched_max_size: int, seed: int) -> list[dict]:
+    """
+    Runs every applicable solver on every kind and size of matrix.
+    The batched QU solver has no shifts, so it can need thousands of sweeps on bigger matrices - it is
+    only run up to batched_max_size rows.
+    :return: One row (dict with FIELDS as keys) per kind, size and solver
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for kind in kinds:
+        for size in sizes:
+            matrices = make_matrices(kind, size, batch, rng)
+            matrix = matrices[0]
+            reference, seconds = time_solver(lambda: np.linalg.eigvals(matrix), repeat)
+            rows.append(dict(kind=kind, size=size, solver="numpy", batch=1, seconds=seconds, max_error=0.0,
+                             iterations=None, residual=None, converged=True))
+
+            solvers = {"shifted_qr": (lambda: shifted_qr(matrix, tolerance, max_iterations), False)}
+            if size == 2:
+                solvers["qu"] = (lambda: qu_converge(matrix, tolerance, max_iterations), False)
+            # The batched QU solver is timed on the whole stack, then reported per matrix. It memoises its
+            # results, so clear them first or every repeat after the first would only time the lookups
+            if size <= batched_max_size:
+                solvers["qu_batched"] = (lambda: clear_cache() or solve_eigenvalues_batched(matrices, tolerance,
+                                                                                            max_iterations), True)
+            if kind == "chain":
+                diagonal, off_diagonal = np.diagonal(matrix).copy(), np.diagonal(matrix, 1).copy()
+                solvers["tridiagonal_sturm"] = (lambda: tridiagonal_sturm(diagonal, off_diagonal), False)
+
+            for name, (solve, batched) in solvers.items():
+                try:
+                    result, seconds = time_solver(solve, repeat)
+                except RuntimeError:
+                    # Didn't converge within max_iterations
+                    rows.append(dict(kind=kind, size=size, solver=name, batch=batch if batched else 1,
+                                     seconds=None, max_error=None, iterations=None, residual=None,
+                                     converged=False))
+                    continue
+                if name == "tridiagonal_sturm":
+                    eigenvalues, iterations = result
+                    residual, solver_converged = None, True
+                    error = max_error(eigenvalues, reference)
+                    converged = accurate(error, reference, tolerance)
+                elif batched:
+                    iterations, residual, solver_converged = result.iterations, result.residual, result.converged
+                    references = [np.linalg.eigvals(m) for m in matrices]
+                    error = max(max_error(e, r) for e, r in zip(result.eigenvalues, references))
+                    converged = all(accurate(max_error(e, r), r, tolerance)
+                                    for e, r in zip(result.eigenvalues, references))
+                    seconds /= batch
+                else:
+                    iterations, residual, solver_converged = result.iterations, result.residual, result.converged
+                    error = max_error(result.eigenvalues, reference)
+                    converged = accurate(error, reference, tolerance)
+                rows.append(dict(kind=kind, size=size, solver=name, batch=batch if batched else 1, seconds=seconds,
+                                 max_error=error, iterations=iterations,
+                                 residual=None if residual is None else float(residual),
+                                 converged=converged and bool(solver_converged)))
+    return rows
+
+
+def benchmark_chains(sizes, tolerance: float) -> list[dict]:
+    """
+    Times the tridiagonal solver on long uniform chains (unit masses and springs, fixed ends), whose
+    eigenvalues are known exactly: -4 sin^2(j pi / 2(N + 1)) for j = 1..N.
+    Each size is only run once, as the biggest take seconds.
+    :return: One row (dict with FIELDS as keys) per size
+    """
+    rows = []
+    for size in sizes:
+        diagonal, off_diagonal = chain_matrix(np.ones(size))
+        exact = np.sort(-4 * np.sin(np.arange(1, size + 1) * np.pi / (2 * (size + 1))) ** 2)
+        (eigenvalues, passes), seconds = time_solver(lambda: tridiagonal_sturm(diagonal, off_diagonal), 1)
+        error = float(np.abs(eigenvalues - exact).max())
+        rows.append(dict(kind="uniform-chain", size=size, solver="tridiagonal_sturm", batch=1, seconds=seconds,
+                         max_error=error, iterations=passes, residual=None,
+                         converged=accurate(error, exact, tolerance)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the eigen-solvers against np.linalg.eigvals.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 4, 8, 16, 32, 64])
+    parser.add_argument("--kinds", nargs="+", default=["symmetric", "non-symmetric", "chain", "harmonic"])
+    parser.add_argument("--batch", type=int, default=64, help="matrices per stack for the batched solver")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats (fastest is kept)")
+    parser.add_argument("--tolerance", type=float, default=1e-10,
+                        help="residual to stop at, and largest error (relative to the largest eigenvalue) "
+                             "counted as converged")
+    parser.add_argument("--max-iterations", type=int, default=500)
+    parser.add_argument("--batched-max-size", type=int, default=8,
+                        help="largest matrix size to run the (unshifted) batched QU solver on")
+    parser.add_argument("--chain-sizes", type=int, nargs="*", default=[1000, 10_000],
+                        help="lengths of the uniform chains to time the tridiagonal solver on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="file to write the results to as JSON")
+    parser.add_argument("--csv", help="file to write the results to as CSV")
+    args = parser.parse_args()
+
+    rows = benchmark(args.sizes, args.kinds, args.batch, args.repeat, args.tolerance,
+                     args.max_iterations, args.batched_max_size, args.seed)
+    rows += benchmark_chains(args.chain_sizes, args.tolerance)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(rows, file, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    # Always print a summary to the terminal as well
+    for row in rows:
+        seconds = "-" if row["seconds"] is None else f"{row['seconds']:.2e}s"
+        error = "-" if row["max_error"] is None else f"{row['max_error']:.1e}"
+        print(f"{row['kind']:>13} n={row['size']:<5} {row['solver']:<17} x{row['batch']:<3} {seconds:>10}/matrix  "
+              f"err={error:<8} it={row['iterations']} converged={row['converged']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import numpy as np
+
+
+# A chain of N masses joined by springs is the N-mass version of harmonic_matrix() in eigensolver.py.
+# Its dynamical matrix M^-1 K is similar to the symmetric matrix -M^(-1/2) K M^(-1/2), which is
+# tridiagonal - so we only ever need to store its diagonal and off-diagonal (O(N) memory).
+
+def chain_matrix(masses, springs=1.0, ends="fixed"):
+    """
+    Builds the symmetric tridiagonal dynamical matrix of a chain of masses joined by springs.
+    Same sign convention as harmonic_matrix(): the eigenvalues are -omega^2.
+    :param masses: The N masses along the chain (kg)
+    :param springs: Spring constant(s) (Nm-1) - a single value, or one per spring, in order along the chain.
+                    There are N - 1 springs between the masses, plus one more for each fixed end.
+    :param ends: "fixed" (attached to walls) or "free", or a (left, right) pair of those
+    :return: The diagonal (length N) and off-diagonal (length N - 1) of the matrix
+    """
+    masses = np.atleast_1d(np.asarray(masses, dtype=float))
+    left, right = (ends, ends) if isinstance(ends, str) else ends
+    for end in (left, right):
+        if end not in ("fixed", "free"):
+            raise ValueError(f"Chain ends must be 'fixed' or 'free', not '{end}'")
+    n = len(masses)
+    spring_count = n - 1 + (left == "fixed") + (right == "fixed")
+    springs = np.broadcast_to(np.asarray(springs, dtype=float), (spring_count,))
+
+    # Pad with zero-stiffness springs at any free end so every mass has one spring either side
+    padded = np.concatenate(([0.0] if left == "free" else [],
+                             springs,
+                             [0.0] if right == "free" else []))
+    diagonal = -(padded[:-1] + padded[1:]) / masses
+    off_diagonal = padded[1:-1] / np.sqrt(masses[:-1] * masses[1:])
+    return diagonal, off_diagonal
+
+
+def sturm_sequence(diagonal, squared_off_diagonal, shifts, derivatives: bool = True):
+    """
+    Runs the Sturm sequence q_i = (d_i - x) - e_(i-1)^2 / q_(i-1) of a symmetric tridiagonal matrix for a
+    whole array of shifts x at once. The loop goes down the N rows, with every step vectorised over the shifts.
+    The characteristic polynomial p is the product of the q_i, so its log-derivatives are sums over them too.
+    :param diagonal: The N diagonal elements
+    :param squared_off_diagonal: The N - 1 off-diagonal elements, squared
+    :param shifts: The shifts x to evaluate at
+    :param derivatives: Also work out G = p'/p and H = G^2 - p''/p (otherwise only the counts are returned)
+    :return: The number of eigenvalues below each shift, then G and H if asked for
+    """
+    shifts = np.asarray(shifts, dtype=float)
+    # An exact zero in the sequence gives an infinity, which the recurrence carries through correctly
+    # (it counts as a tiny positive q) - so just silence the warnings rather than testing for it.
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        q = diagonal[0] - shifts
+        count = (q < 0).astype(np.int64)
+        if not derivatives:
+            for i in range(1, len(diagonal)):
+                q = (diagonal[i] - shifts) - squared_off_diagonal[i - 1] / q
+                count += q < 0
+            return count
+        # Carry w = q'/q and z = q''/q rather than the derivatives themselves, which overflow near a root.
+        # A q of (nearly) zero is replaced by -pivot, a rounding-sized change to the matrix, so its terms stay
+        # finite and cancel. Everything is updated in place, as this loop is where nearly all the time goes.
+        pivot = np.finfo(float).eps * (np.abs(diagonal).max() + 2 * np.sqrt(squared_off_diagonal.max(initial=0.0)))
+        small = np.abs(q) < pivot
+        q[small] = -pivot
+        count[small] = 1
+        w = -1.0 / q
+        z = np.zeros_like(q)
+        g, h = w.copy(), w * w
+        ratio, scratch = np.empty_like(q), np.empty_like(q)
+        negative = np.empty(q.shape, dtype=bool)
+        for i in range(1, len(diagonal)):
+            np.divide(squared_off_diagonal[i - 1], q, out=ratio)
+            np.subtract(diagonal[i], shifts, out=q)
+            q -= ratio
+            np.abs(q, out=scratch)
+            np.less(scratch, pivot, out=negative)
+            np.copyto(q, -pivot, where=negative)
+            np.less(q, 0.0, out=negative)
+            count += negative
+            # q_i'' = ratio (z - 2 w^2) and q_i' = ratio w - 1, from differentiating the recurrence
+            np.multiply(w, w, out=scratch)
+            scratch *= 2.0
+            z -= scratch
+            z *= ratio
+            w *= ratio
+            w -= 1.0
+            np.divide(1.0, q, out=scratch)
+            w *= scratch
+            z *= scratch
+            g += w
+            np.multiply(w, w, out=scratch)
+            scratch -= z
+            h += scratch
+    return count, g, h
+
+
+def tridiagonal_sturm(diagonal, off_diagonal, tolerance: float = 4 * np.finfo(float).eps,
+                      max_iterations: int = 200):
+    """
+    Finds every eigenvalue of a symmetric tridiagonal matrix at once, using Sturm-sequence counts.
+    One pass over a grid of N + 1 points brackets every eigenvalue. Brackets holding more than one eigenvalue
+    are then multisected (sharing about N count points between them per pass) until each holds just one,
+    and all of them are closed together with Laguerre steps - which, for a polynomial with real roots, never
+    step past the nearest root on the chosen side, and converge cubically.
+    Every sturm_sequence() call is vectorised over all the unconverged eigenvalues, so memory stays O(N),
+    but each pass is still O(N) work per unconverged eigenvalue - O(N^2) over a solve, which is a few
+    seconds at N = 10^4 but minutes at 10^5.
+    :param diagonal: The N diagonal elements
+    :param off_diagonal: The N - 1 off-diagonal elements
+    :param tolerance: Accuracy to find each eigenvalue to, relative to |eigenvalue| + the matrix norm
+                      (as with bisection, tiny eigenvalues are only as accurate as the largest ones).
+    :param max_iterations: Give up (with a RuntimeError) after this many passes.
+    :return: Eigenvalues (ascending) and the number of passes used
+    """
+    diagonal = np.asarray(diagonal, dtype=float)
+    off_diagonal = np.abs(np.asarray(off_diagonal, dtype=float))
+    n = len(diagonal)
+    # A zero off-diagonal would give 0/0 in the sequence; nudging it by a denormal changes nothing else
+    squared = np.maximum(off_diagonal ** 2, np.finfo(float).tiny)
+    # Gershgorin discs bound the whole spectrum
+    radius = np.concatenate(([0.0], off_diagonal)) + np.concatenate((off_diagonal, [0.0]))
+    scale = max(np.abs(diagonal).max(initial=0.0) + radius.max(initial=0.0), np.finfo(float).tiny)
+    lowest = (diagonal - radius).min() - tolerance * scale
+    highest = (diagonal + radius).max() + tolerance * scale
+
+    # Eigenvalue j is bracketed by points with counts <= j (low) and > j (high), starting from a shared grid
+    grid = np.linspace(lowest, highest, n + 1)
+    grid_counts = sturm_sequence(diagonal, squared, grid, derivatives=False)
+    grid_counts[0], grid_counts[-1] = 0, n
+    cell = np.searchsorted(grid_counts, np.arange(n), side="right") - 1
+    low, high = grid[cell], grid[cell + 1]
+    count_low, count_high = grid_counts[cell], grid_counts[cell + 1]
+    eigenvalues = (low + high) / 2
+    active = np.arange(n)
+    passes = 0
+    while active.size:
+        if passes == max_iterations:
+            raise RuntimeError(f"Sturm bisection failed to converge after {passes} passes")
+        passes += 1
+
+        split = active[count_high[active] - count_low[active] > 1]
+        if split.size:
+            # Eigenvalues sharing a bracket share its points, so multisect each distinct bracket once,
+            # splitting it into equal parts (a pass costs the same for up to ~1000 points). The points
+            # are never copied out per eigenvalue, so a bracket holding most of the spectrum stays O(N).
+            brackets, shared = np.unique(np.column_stack((low[split], high[split])), axis=0, return_inverse=True)
+            shared = shared.ravel()
+            parts = max(2, max(n, 1024) // len(brackets))
+            points = brackets[:, :1] + (brackets[:, 1:] - brackets[:, :1]) * (np.arange(1, parts) / parts)
+            counts = sturm_sequence(diagonal, squared, points.ravel(), derivatives=False).reshape(points.shape)
+            # Counts should rise along each row - make sure round-off hasn't broken that, then offset every
+            # row past the last so one flat searchsorted finds, for each j, the last point counting <= j
+            counts = np.maximum.accumulate(counts, axis=1)
+            width = parts - 1
+            offsets = np.arange(len(brackets))[:, None] * (n + 1)
+            found = np.searchsorted((counts + offsets).ravel(), shared * (n + 1) + split, side="right")
+            last = found - shared * width - 1
+            points, counts = points.ravel(), counts.ravel()
+            below, above = last >= 0, last < width - 1
+            lower = shared * width + np.maximum(last, 0)
+            upper = shared * width + np.minimum(last + 1, width - 1)
+            low[split] = np.where(below, points[lower], low[split])
+            count_low[split] = np.where(below, counts[lower], count_low[split])
+            high[split] = np.where(above, points[upper], high[split])
+            count_high[split] = np.where(above, counts[upper], count_high[split])
+            eigenvalues[split] = (low[split] + high[split]) / 2
+            # Brackets that have isolated their eigenvalue start Laguerre steps from their midpoint once
+            # every bracket is isolated; any that shrink to nothing first (a repeated eigenvalue) are done.
+            limit = tolerance * (np.maximum(np.abs(low[split]), np.abs(high[split])) + scale)
+            finished = split[high[split] - low[split] <= limit]
+        else:
+            x = eigenvalues[active]
+            count, g, h = sturm_sequence(diagonal, squared, x)
+            # Shrink each bracket towards its own eigenvalue
+            above = count > active
+            high[active] = np.where(above, x, high[active])
+            low[active] = np.where(above, low[active], x)
+            lo, hi = low[active], high[active]
+            # Laguerre step towards the side the eigenvalue is on
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                root = np.sqrt((n - 1) * np.maximum(n * h - g * g, 0.0))
+                laguerre = x - n / np.where(above, g + root, g - root)
+            usable = np.isfinite(laguerre) & (laguerre >= lo) & (laguerre <= hi)
+            eigenvalues[active] = np.where(usable, laguerre, (lo + hi) / 2)
+            limit = tolerance * (np.maximum(np.abs(lo), np.abs(hi)) + scale)
+            finished = active[(hi - lo <= limit) | (usable & (np.abs(laguerre - x) <= limit))]
+        active = active[~np.isin(active, finished)]
+    return eigenvalues, passes
+
+
+def tridiagonal_eigenvalues(diagonal, off_diagonal, tolerance: float = 4 * np.finfo(float).eps):
+    """
+    Finds all eigenvalues of a symmetric tridiagonal matrix (see tridiagonal_sturm()).
+    :param diagonal: The N diagonal elements
+    :param off_diagonal: The N - 1 off-diagonal elements
+    :param tolerance: Relative accuracy to find each eigenvalue to.
+    :return: Eigenvalues in ascending order
+    """
+    return tridiagonal_sturm(diagonal, off_diagonal, tolerance)[0]
+
+
+def tridiagonal_eigenvectors(diagonal, off_diagonal, eigenvalues, tolerance: float = 1e-13,
+                             max_iterations: int = 10, cluster: float = 1e-5, seed: int = 0):
+    """
+    Finds the eigenvectors of a symmetric tridiagonal matrix by inverse iteration, solving the
+    tridiagonal systems (T - lambda I) v_new = v for every eigenvalue at once (Thomas algorithm).
+    The loops run down the N rows, with each step vectorised over all the eigenvalues.
+    Each vector starts from a random guess, so none of them start out orthogonal to their eigenvector
+    (as e.g. all ones is to the antisymmetric modes of a mirror-symmetric chain). Vectors whose eigenvalues
+    are within `cluster` of each other can't be told apart this way, so after every step they are
+    orthogonalised against each other - which also gives a full set of vectors for a repeated eigenvalue.
+    :param diagonal: The N diagonal elements
+    :param off_diagonal: The N - 1 off-diagonal elements
+    :param eigenvalues: The eigenvalues to find vectors for, e.g. from tridiagonal_eigenvalues()
+    :param tolerance: Stop once every residual |T v - lambda v| is below this (relative to the matrix norm).
+    :param max_iterations: Give up (with a RuntimeError) after this many inverse iteration steps.
+    :param cluster: Eigenvalues closer than this (relative to the matrix norm) are orthogonalised together.
+    :param seed: Seed for the random starting vectors, so results are repeatable
+    :return: (N, K) matrix whose columns are the unit eigenvectors, in the same order as the eigenvalues
+    """
+    diagonal = np.asarray(diagonal, dtype=float)
+    off_diagonal = np.asarray(off_diagonal, dtype=float)
+    eigenvalues = np.asarray(eigenvalues, dtype=float)
+    n, k = len(diagonal), len(eigenvalues)
+    scale = np.abs(diagonal).max(initial=0.0) + 2 * np.abs(off_diagonal).max(initial=0.0) or 1.0
+    # Pivots that land (almost) exactly on zero are replaced by this - standard for inverse iteration
+    tiny = np.finfo(float).eps * scale
+    # Nudge the shifts off the eigenvalues so the systems aren't exactly singular
+    shifts = eigenvalues + 10 * tiny
+
+    # Factorise each T - shift I once: pivots down the diagonal, and the eliminated upper diagonal
+    pivots = np.empty((n, k))
+    upper = np.empty((max(n - 1, 0), k))
+    pivot = diagonal[0] - shifts
+    for i in range(n):
+        if i > 0:
+            pivot = diagonal[i] - shifts - off_diagonal[i - 1] * upper[i - 1]
+        pivot = np.where(np.abs(pivot) < tiny, tiny, pivot)
+        pivots[i] = pivot
+        if i < n - 1:
+            upper[i] = off_diagonal[i] / pivot
+
+    # Groups of eigenvalues closer than `cluster` to their neighbour, in ascending order
+    order = np.argsort(eigenvalues)
+    breaks = np.flatnonzero(np.diff(eigenvalues[order]) > cluster * scale) + 1
+    groups = [group for group in np.split(order, breaks) if len(group) > 1]
+
+    vectors = np.random.default_rng(seed).standard_normal((n, k))
+    for iteration in range(max_iterations):
+        # Forward sweep, then back substitution
+        vectors[0] /= pivots[0]
+        for i in range(1, n):
+            vectors[i] -= off_diagonal[i - 1] * vectors[i - 1]
+            vectors[i] /= pivots[i]
+        for i in range(n - 2, -1, -1):
+            vectors[i] -= upper[i] * vectors[i + 1]
+        for group in groups:
+            vectors[:, group] = np.linalg.qr(vectors[:, group])[0]
+        vectors /= np.linalg.norm(vectors, axis=0)
+
+        residual = (diagonal[:, None] - eigenvalues) * vectors
+        residual[:-1] += off_diagonal[:, None] * vectors[1:]
+        residual[1:] += off_diagonal[:, None] * vectors[:-1]
+        if np.linalg.norm(residual, axis=0).max(initial=0.0) <= tolerance * scale:
+            return vectors
+    raise RuntimeError(f"Inverse iteration failed to converge after {max_iterations} iterations")
+
+
+def chain_frequencies(masses, springs=1.0, ends="fixed"):
+    """
+    Normal-mode angular frequencies of a chain of masses (see chain_matrix() for the parameters).
+    :return: Frequencies in ascending order (rad s^-1)
+    """
+    eigenvalues = tridiagonal_eigenvalues(*chain_matrix(masses, springs, ends))
+    # Eigenvalues are -omega^2; clip the tiny positive round-off a free chain's zero mode can pick up
+    return np.sqrt(np.clip(-eigenvalues, 0.0, None))[::-1]
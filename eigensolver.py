@@ -0,0 +1,512 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# region DEBUGGING
+
+# debug flags
+# use if you want to see various debug info
+# recommended to not use with high iteration counts!
+debug = False
+debug_fc = False
+
+
+# endregion
+
+# region HELPER FUNCTIONS
+
+class EigenResult(object):
+    """
+    Helper class for the output of a tolerance-based eigenvalue solve.
+    """
+
+    def __init__(self, eigenvalues, iterations: int, residual: float, converged: bool = True) -> None:
+        self.eigenvalues = eigenvalues
+        self.iterations = iterations  # number of QU/QR steps actually used
+        self.residual = residual  # largest relative size of the elements left below the leading diagonal
+        self.converged = converged  # False if max_iterations ran out (or the iteration broke down)
+
+
+def qu_residual(matrices):
+    """
+    Measures how far a QU iteration is from converging: the largest element below the leading diagonal,
+    relative to the largest eigenvalue estimate on it. Works on a single matrix or a stack of them.
+    :param matrices: Matrix of shape (n, n), or stack of shape (B, n, n)
+    :return: Residual (one per matrix for a stack)
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    below = np.abs(np.tril(matrices, -1)).max(axis=(-2, -1))
+    scale = np.abs(np.diagonal(matrices, axis1=-2, axis2=-1)).max(axis=-1)
+    return below / np.where(scale == 0, 1.0, scale)
+
+
+def fc_operation(f, c):
+    """
+    Applies operation to find vector f as outlined in Gram-Schmidt process.
+    :param f: Input vector
+    :param c: Relevant column of matrix as a vector
+    :return: Orthogonal f_vector for QU algorithm
+    """
+    f, c = np.array(f), np.array(c)
+    dot_product = np.dot(f, c)
+    normalisation_coefficient = np.power(np.linalg.norm(f), 2).round(5)
+    # See W2:L2 lecture; slide 6 for equation
+    if debug_fc:
+        print("=== FC STUFF ===")
+        print(f"The dot product of these vectors was {dot_product}")
+        print(f"Normalising f gave me {normalisation_coefficient}")
+        print(f"Performing: ({dot_product} / {normalisation_coefficient}) * {f}")
+        print(f"Thus, I return {(dot_product / normalisation_coefficient) * f}")
+        print("=== END FC STUFF ===")
+    return (dot_product / normalisation_coefficient) * f
+
+
+def qu_algorithm(matrix):
+    """
+    Applies QU factorisation to find eigenvalues of a matrix.
+    :param matrix: Matrix to act upon
+    """
+    # Transpose matrix into column vectors
+
+    if debug:
+        print(f"Working on: {matrix}")
+    matrix_t = np.transpose(matrix)
+
+    # Construct a matrix of the f vectors.
+    # Get current column, find normalisation coefficient for column,
+    # iterate over remaining columns
+    M_f = []
+    for k, c_k in enumerate(matrix_t):
+        # f_1 should always be the first column, so simply skip it
+        if k == 0:
+            M_f.append(c_k)
+        else:
+            # Calculate f_s - see lecture 4, slide 9, step 1
+            f_k = c_k
+            for col_target in range(k):
+                if col_target > 0:
+                    f_vector = fc_operation(M_f[k - 1], c_k)
+                else:
+                    f_vector = matrix_t[col_target]
+                f_k -= fc_operation(f_vector, c_k)
+            M_f.append(f_k)
+
+    if debug:
+        print(f"M_f: {M_f}")
+
+    # Create our Q matrix from the F matrix
+    # We could have directly made M_q in the above loops,
+    # but storing the F matrix is useful for the next set of steps.
+    M_q = []
+    for col in M_f:
+        if np.linalg.norm(col) == 0:
+            M_q.append(col * np.linalg.norm(col))
+        else:
+            M_q.append(col / np.linalg.norm(col))
+    M_q = np.transpose(M_q)
+
+    if debug:
+        print(f"M_q: {M_q}")
+
+    # Iterate over all columns in our Q matrix, preparing to set up U matrix
+    M_u = []
+    for M_q_x in range(len(M_q)):
+        row_list = []
+        # Then iterate over all rows in our Q matrix
+        # Apply relevant operation depending on whether element is
+        # above or below the leading diagonal
+        for M_q_y in range(len(M_q)):
+            if M_q_x > M_q_y:
+                # Below leading diagonal
+                row_list.append(0.0)
+            if M_q_x == M_q_y:
+                # On the leading diagonal
+                row_list.append(np.linalg.norm(np.array(M_f)[M_q_x]).round(5))
+            if M_q_y > M_q_x:
+                # Above leading diagonal
+                value_to_add = np.dot(np.transpose(matrix)[M_q_y], np.transpose(M_q)[M_q_x]).round(5)
+                row_list.append(value_to_add)
+        M_u.append(row_list)
+    # We have performed all necessary operations on a 2x2 matrix
+    output = M_u @ M_q
+    if debug:
+        print(f"M_u: {M_u}")
+        print(f"M_q: {M_q}")
+        print(f"output: {output}\n============================")
+    return output
+
+
+def get_eigenvalues(target_matrix, iterations: int):
+    """
+    Performs the QU algorithm to find eigenvalues of a coupled harmonic oscillator.
+    :param target_matrix: The matrix to get the eigenvalues of
+    :param iterations: Number of iterations to perform algorithm over.
+    :return: 2x2 matrix with the eigenvalues on the leading diagonal
+    """
+    # Note: I extracted the logic from qu_algorithm() because I felt the control flow of the code was
+    # slightly messier than I would prefer - all this function does is wrap a for-loop.
+    matrix = target_matrix
+    for iteration in range(iterations):
+        matrix = qu_algorithm(
+            [[matrix[0][0], matrix[0][1]],
+             [matrix[1][0], matrix[1][1]]])
+    return matrix
+
+
+def solve_eigenvalues(target_matrix, tolerance: float = 1e-8, max_iterations: int = 10_000) -> EigenResult:
+    """
+    Finds eigenvalues to a given tolerance, so there's no need to guess an iteration count.
+    Uses the shifted QR solver, which also copes with complex eigenvalues and raises a RuntimeError if
+    it runs out of iterations.
+    Results are memoised on the matrix contents (see _cache_get). That only pays off when one process
+    solves the same matrix again, e.g. from an interactive session - main.py's manual mode solves once
+    per run. Use shifted_qr() directly to skip the cache.
+    :param target_matrix: The matrix to get the eigenvalues of
+    :param tolerance: Relative size below which a subdiagonal element is treated as zero.
+    :param max_iterations: Give up after this many iterations.
+    :return: EigenResult with the eigenvalues, iterations used and final residual
+    """
+    matrix = np.asarray(target_matrix, dtype=float)
+    key = ("shifted_qr", matrix.shape, matrix.tobytes(), tolerance, max_iterations)
+    result = _cache_get(key)
+    if result is None:
+        result = _cache_put(key, shifted_qr(matrix, tolerance, max_iterations))
+    return _copy_result(result)
+
+
+# Memoised results, most recently used last. Entries are per matrix, so the batched solver can reuse
+# rows solved by an earlier call even when the rest of the stack is new.
+_cache = OrderedDict()
+_cache_size = 4096
+
+
+def _cache_get(key):
+    result = _cache.get(key)
+    if result is not None:
+        _cache.move_to_end(key)
+    return result
+
+
+def _cache_put(key, result: EigenResult) -> EigenResult:
+    # The stored result is shared between callers, so it never leaves the cache without _copy_result()
+    result.eigenvalues = np.array(result.eigenvalues)
+    result.eigenvalues.flags.writeable = False
+    _cache[key] = result
+    if len(_cache) > _cache_size:
+        _cache.popitem(last=False)
+    return result
+
+
+def _copy_result(result: EigenResult) -> EigenResult:
+    return EigenResult(result.eigenvalues.copy(), result.iterations, result.residual, result.converged)
+
+
+def clear_cache() -> None:
+    """
+    Forgets every memoised result from solve_eigenvalues() and solve_eigenvalues_batched().
+    """
+    _cache.clear()
+
+
+def qu_converge(target_matrix, tolerance: float = 1e-8, max_iterations: int = 10_000) -> EigenResult:
+    """
+    Runs the QU algorithm on a 2x2 matrix until qu_residual() is below the tolerance.
+    Note qu_algorithm() rounds its intermediate values to 5 d.p., so the eigenvalues are only good to
+    about that however small the residual gets - use solve_eigenvalues() when accuracy matters.
+    :param target_matrix: The matrix to get the eigenvalues of
+    :param tolerance: Residual at which to stop iterating.
+    :param max_iterations: Give up after this many iterations.
+    :return: EigenResult with the eigenvalues, iterations used, final residual and whether it converged
+    """
+    matrix = target_matrix
+    iteration, residual = 0, qu_residual(matrix)
+    # Written as `not <=` so a NaN residual never counts as converged
+    while not residual <= tolerance and iteration < max_iterations:
+        matrix = qu_algorithm([[matrix[0][0], matrix[0][1]],
+                               [matrix[1][0], matrix[1][1]]])
+        iteration += 1
+        residual = qu_residual(matrix)
+        if np.isnan(residual):
+            # The rounding in qu_algorithm() can divide by zero for tiny entries - no point carrying on
+            break
+    return EigenResult(np.diagonal(np.asarray(matrix, dtype=float)).copy(), iteration, float(residual),
+                       bool(residual <= tolerance))
+
+
+def qu_algorithm_batched(matrices):
+    """
+    Applies one QU step to a whole stack of matrices at once.
+    Same Gram-Schmidt process as qu_algorithm(), but each column operation is done for every matrix in
+    the stack in a single NumPy call, so the Python loops only run over the n columns.
+    :param matrices: Stack of matrices with shape (B, n, n)
+    :return: Stack of U @ Q products with shape (B, n, n)
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    n = matrices.shape[-1]
+    M_q = np.zeros_like(matrices)
+    M_u = np.zeros_like(matrices)
+    for k in range(n):
+        # Calculate f_k by removing the components along every previous q column
+        f_k = matrices[:, :, k].copy()
+        for j in range(k):
+            M_u[:, j, k] = np.einsum('bi,bi->b', M_q[:, :, j], f_k)
+            f_k -= M_u[:, j, k, None] * M_q[:, :, j]
+        # Leading diagonal of U is the norm of f_k - leave q as zeros where that norm vanishes
+        norm = np.linalg.norm(f_k, axis=1)
+        M_u[:, k, k] = norm
+        np.divide(f_k, norm[:, None], out=M_q[:, :, k], where=norm[:, None] != 0)
+    return M_u @ M_q
+
+
+def get_eigenvalues_batched(matrices, iterations: int):
+    """
+    Performs the QU algorithm on a whole stack of matrices at once.
+    :param matrices: Stack of matrices with shape (B, n, n)
+    :param iterations: Number of iterations to perform algorithm over.
+    :return: Array of shape (B, n) with the eigenvalues of each matrix (the leading diagonals)
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    for iteration in range(iterations):
+        matrices = qu_algorithm_batched(matrices)
+    return np.diagonal(matrices, axis1=1, axis2=2).copy()
+
+
+def solve_eigenvalues_batched(matrices, tolerance: float = 1e-8, max_iterations: int = 10_000) -> EigenResult:
+    """
+    Tolerance-based version of get_eigenvalues_batched(). Iterates until every matrix in the stack has
+    converged, and only solves each distinct matrix once (sweeps often repeat parameter combinations).
+    Each matrix's result is memoised like solve_eigenvalues(), so matrices already solved by an earlier
+    call in the same process (e.g. calling graph_eigenvalues() again with the same spring constant) are
+    looked up, not iterated. Stacks with more distinct matrices than the cache holds skip it, which
+    includes sweep.py's chunks at the default chunk size.
+    :param matrices: Stack of matrices with shape (B, n, n)
+    :param tolerance: Residual at which to stop iterating.
+    :param max_iterations: Give up after this many iterations - check `converged` on the result!
+    :return: EigenResult with (B, n) eigenvalues, the most iterations any matrix needed, the worst
+             residual in the stack and whether every matrix converged
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    unique, inverse = np.unique(matrices.reshape(len(matrices), -1), axis=0, return_inverse=True)
+    unique = unique.reshape((-1,) + matrices.shape[1:])
+    eigenvalues = np.empty(unique.shape[:2])
+    iterations = np.zeros(len(unique), dtype=int)
+    residuals = np.zeros(len(unique))
+    # Stacks bigger than the cache (large sweep chunks) would only churn it, so they skip it
+    keys = None
+    if len(unique) <= _cache_size:
+        keys = [("qu_batched", row.shape, row.tobytes(), tolerance, max_iterations) for row in unique]
+    misses = np.arange(len(unique))
+    if keys is not None:
+        hits = [(index, result) for index, result in enumerate(map(_cache_get, keys)) if result is not None]
+        for index, result in hits:
+            eigenvalues[index], iterations[index], residuals[index] = (result.eigenvalues, result.iterations,
+                                                                       result.residual)
+        misses = np.setdiff1d(misses, [index for index, result in hits])
+    if len(misses):
+        working = unique[misses]
+        iteration, residual = 0, qu_residual(working).max(initial=0.0)
+        # Written as `not <=` so a NaN residual never counts as converged
+        while not residual <= tolerance and iteration < max_iterations and not np.isnan(residual):
+            working = qu_algorithm_batched(working)
+            iteration += 1
+            residual = qu_residual(working).max(initial=0.0)
+        eigenvalues[misses] = np.diagonal(working, axis1=1, axis2=2)
+        iterations[misses] = iteration
+        residuals[misses] = qu_residual(working)
+        if keys is not None:
+            for index in misses:
+                _cache_put(keys[index], EigenResult(eigenvalues[index], iteration, float(residuals[index]),
+                                                    bool(residuals[index] <= tolerance)))
+    residual = residuals.max(initial=0.0)
+    return EigenResult(eigenvalues[inverse.ravel()], int(iterations.max(initial=0)), float(residual),
+                       bool(residual <= tolerance))
+
+
+def hessenberg(matrix):
+    """
+    Reduces a square matrix to upper Hessenberg form (zero below the first subdiagonal) using
+    Householder reflections. The result is similar to the input, so it has the same eigenvalues.
+    :param matrix: Matrix to reduce
+    :return: Upper Hessenberg matrix as a NumPy array
+    """
+    H = np.array(matrix, dtype=float)
+    n = len(H)
+    for k in range(n - 2):
+        # Reflect the column below the subdiagonal onto its first element
+        v = H[k + 1:, k].copy()
+        alpha = -np.copysign(np.linalg.norm(v), v[0])
+        v[0] -= alpha
+        v_norm = np.linalg.norm(v)
+        if v_norm == 0:
+            # Column is already zero below the subdiagonal
+            continue
+        v /= v_norm
+        # Apply P = I - 2vv^T from both sides
+        H[k + 1:, k:] -= 2 * np.outer(v, v @ H[k + 1:, k:])
+        H[:, k + 1:] -= 2 * np.outer(H[:, k + 1:] @ v, v)
+        H[k + 2:, k] = 0.0
+    return H
+
+
+def wilkinson_shift(a, b, c, d):
+    """
+    Finds the eigenvalue of the 2x2 matrix [[a, b], [c, d]] closest to d.
+    """
+    half_trace = (a + d) / 2
+    root = np.sqrt(complex(half_trace * half_trace - (a * d - b * c)))
+    lambda_1, lambda_2 = half_trace + root, half_trace - root
+    return lambda_1 if abs(lambda_1 - d) < abs(lambda_2 - d) else lambda_2
+
+
+def get_eigenvalues_general(target_matrix, tolerance: float = 1e-12, max_iterations: int = None):
+    """
+    Finds all eigenvalues of an n x n matrix with the shifted QR algorithm.
+    The matrix is reduced to Hessenberg form once, then QR steps with a Wilkinson shift are applied to
+    the unconverged part only. Whenever a subdiagonal element falls below the tolerance, the eigenvalue
+    under it has converged and is split off (deflation).
+    :param target_matrix: The matrix to get the eigenvalues of
+    :param tolerance: Relative size below which a subdiagonal element is treated as zero.
+    :param max_iterations: Cap on the total number of QR steps (defaults to 30 per eigenvalue).
+    :return: 1D array of eigenvalues - real if the matrix has no complex eigenvalues
+    """
+    return shifted_qr(target_matrix, tolerance, max_iterations).eigenvalues
+
+
+def shifted_qr(target_matrix, tolerance: float = 1e-12, max_iterations: int = None) -> EigenResult:
+    """
+    Does the work for get_eigenvalues_general(), also reporting the number of QR steps taken and the
+    largest relative subdiagonal element that was treated as zero.
+    """
+    # Work in complex numbers so complex-conjugate pairs of non-symmetric matrices can converge too
+    H = hessenberg(target_matrix).astype(complex)
+    n = len(H)
+    if max_iterations is None:
+        max_iterations = 30 * n
+    eigenvalues = np.zeros(n, dtype=complex)
+    scale = np.linalg.norm(H) or 1.0
+    hi = n - 1
+    iterations, since_deflation = 0, 0
+    residual = 0.0
+    while hi >= 0:
+        # Find the start of the active (unreduced) block ending at row hi
+        lo = hi
+        while lo > 0:
+            neighbours = abs(H[lo, lo]) + abs(H[lo - 1, lo - 1]) or scale
+            if abs(H[lo, lo - 1]) <= tolerance * neighbours:
+                residual = max(residual, abs(H[lo, lo - 1]) / neighbours)
+                H[lo, lo - 1] = 0.0
+                break
+            lo -= 1
+        if lo == hi:
+            # Bottom eigenvalue has converged - deflate it
+            eigenvalues[hi] = H[hi, hi]
+            hi -= 1
+            since_deflation = 0
+            continue
+        if iterations >= max_iterations:
+            raise RuntimeError(f"QR algorithm failed to converge after {iterations} iterations")
+
+        W = H[lo:hi + 1, lo:hi + 1]
+        m = len(W)
+        if since_deflation in (10, 20):
+            # Exceptional shift to break out of any cycle
+            mu = W[-1, -1] + abs(W[-1, -2])
+        else:
+            mu = wilkinson_shift(W[-2, -2], W[-2, -1], W[-1, -2], W[-1, -1])
+        W -= mu * np.eye(m)
+        # QR: Givens rotations zero the subdiagonal, turning W into R
+        rotations = []
+        for i in range(m - 1):
+            a, b = W[i, i], W[i + 1, i]
+            r = np.hypot(abs(a), abs(b))
+            c, s = (1.0, 0.0) if r == 0 else (a / r, b / r)
+            rows = W[i:i + 2, i:].copy()
+            W[i, i:] = np.conj(c) * rows[0] + np.conj(s) * rows[1]
+            W[i + 1, i:] = -s * rows[0] + c * rows[1]
+            rotations.append((c, s))
+        # ... then RQ, by applying the same rotations from the right
+        for i, (c, s) in enumerate(rotations):
+            cols = W[:i + 2, i:i + 2].copy()
+            W[:i + 2, i] = c * cols[:, 0] + s * cols[:, 1]
+            W[:i + 2, i + 1] = -np.conj(s) * cols[:, 0] + np.conj(c) * cols[:, 1]
+        W += mu * np.eye(m)
+        iterations += 1
+        since_deflation += 1
+
+    if np.all(np.abs(eigenvalues.imag) <= tolerance * scale):
+        eigenvalues = eigenvalues.real
+    return EigenResult(eigenvalues, iterations, residual)
+
+
+def get_eigenvectors(target_matrix, eigenvalues, tolerance: float = 1e-10, max_iterations: int = 10,
+                     cluster: float = 1e-8, seed: int = 0):
+    """
+    Finds the eigenvector belonging to each (already known) eigenvalue by inverse iteration:
+    repeatedly solving (A - lambda I) v_new = v, which blows up the component along that eigenvector.
+    Each vector starts from a random guess. A repeated eigenvalue has a whole space of eigenvectors,
+    so its copies (eigenvalues within `cluster` of each other) are kept orthogonal to one another to
+    pick out a basis of that space, rather than all landing on the same vector.
+    :param target_matrix: The matrix the eigenvalues belong to
+    :param eigenvalues: Its eigenvalues, e.g. from get_eigenvalues_general()
+    :param tolerance: Stop once the residual |A v - lambda v| is below this (relative to the matrix norm).
+    :param max_iterations: Give up (with a RuntimeError) after this many inverse iteration steps per eigenvalue.
+                           This happens for a defective matrix, which has fewer eigenvectors than eigenvalues.
+    :param cluster: Eigenvalues closer than this (relative to the matrix norm) count as repeated.
+    :param seed: Seed for the random starting vectors, so results are repeatable
+    :return: Matrix whose columns are the unit eigenvectors, in the same order as the eigenvalues
+    """
+    matrix = np.asarray(target_matrix, dtype=float)
+    eigenvalues = np.asarray(eigenvalues)
+    n = len(matrix)
+    scale = np.linalg.norm(matrix) or 1.0
+    rng = np.random.default_rng(seed)
+    vectors = np.zeros((n, len(eigenvalues)), dtype=eigenvalues.dtype)
+    for column, eigenvalue in enumerate(eigenvalues):
+        # Nudge the shift off the eigenvalue so the system isn't exactly singular
+        shifted = matrix - (eigenvalue + 1e-10 * scale) * np.eye(n)
+        found = vectors[:, np.flatnonzero(np.abs(eigenvalues[:column] - eigenvalue) <= cluster * scale)]
+        v = rng.standard_normal(n).astype(vectors.dtype)
+        for iteration in range(max_iterations):
+            v = np.linalg.solve(shifted, v)
+            v -= found @ (found.conj().T @ v)
+            v /= np.linalg.norm(v)
+            if np.linalg.norm(matrix @ v - eigenvalue * v) <= tolerance * scale:
+                break
+        else:
+            raise RuntimeError(f"Inverse iteration failed to converge for eigenvalue {eigenvalue}")
+        vectors[:, column] = v
+    return vectors
+
+
+def harmonic_matrix(m_1, m_2, k):
+    """
+    Helper function for formatting a matrix for the assignment/homework. Simply spits out a matrix if given
+    the physical parameters.
+    :param m_1: First mass
+    :param m_2: Second mass
+    :param k: Spring constant
+    """
+    # See PHYM004_Assessment1.pdf for the matrix equation
+    return [[(-2 * k / m_1), (k / m_2)],
+            [(k / m_1), (-2 * k / m_2)]]
+
+
+def harmonic_matrices(m_1, m_2, k):
+    """
+    Stacked version of harmonic_matrix() - takes arrays (or scalars) of the physical parameters and
+    broadcasts them against each other.
+    :param m_1: First mass(es)
+    :param m_2: Second mass(es)
+    :param k: Spring constant(s)
+    :return: Stack of matrices with shape (B, 2, 2)
+    """
+    m_1, m_2, k = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (m_1, m_2, k)))
+    matrices = np.empty(m_1.shape + (2, 2))
+    matrices[..., 0, 0] = -2 * k / m_1
+    matrices[..., 0, 1] = k / m_2
+    matrices[..., 1, 0] = k / m_1
+    matrices[..., 1, 1] = -2 * k / m_2
+    return matrices.reshape(-1, 2, 2)
+
+
+# endregion
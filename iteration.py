@@ -1,4 +1,4 @@
-from main import *
+from eigensolver import *
 
 matrix = [[-1, 0.5],
           [0.5, -1]]
@@ -0,0 +1,65 @@
+import numpy as np
+
+from utilities import VerletOutput
+
+
+# The integrator records one entry per body per step, body after body, so any of its
+# flat lists can be viewed as a (steps, N) table without copying or looping.
+
+def columns(values: list, body_n: int) -> np.ndarray:
+    """
+    Reshapes a flat per-body list from the integrator into a (steps, N) array.
+    :param values: The flat list to reshape, e.g. VerletOutput.energies[2].
+    :param body_n: Number of bodies in the list.
+    :return: Array with one row per step and one column per body.
+    """
+    return np.asarray(values, dtype=float).reshape(-1, body_n)
+
+
+def positions(output: VerletOutput, body_n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pulls the x- and y- coordinates of every recorded body into (steps, N) arrays.
+    :param output: The output of the Verlet integration.
+    :param body_n: Number of bodies in the system.
+    :return: The x array, then the y array.
+    """
+    count = len(output.bodies)
+    xs = np.fromiter((body.pos.x for body in output.bodies), dtype=float, count=count)
+    ys = np.fromiter((body.pos.y for body in output.bodies), dtype=float, count=count)
+    return xs.reshape(-1, body_n), ys.reshape(-1, body_n)
+
+
+def totals(values: list, body_n: int) -> np.ndarray:
+    """
+    Sums a per-body variable over all bodies at each step.
+    :param values: The flat list to total.
+    :param body_n: Number of bodies in the list.
+    :return: One total per step.
+    """
+    return columns(values, body_n).sum(axis=1)
+
+
+def radius_deviation(x: np.ndarray, y: np.ndarray, semi_major_axis: float) -> np.ndarray:
+    """
+    Finds the % deviation of an orbit from its predicted semi-major axis.
+    :param x: The x-coordinates of the orbiting body.
+    :param y: The y-coordinates of the orbiting body.
+    :param semi_major_axis: The predicted semi-major axis (m).
+    :return: % deviation at each step.
+    """
+    return 100 * ((np.hypot(x, y) - semi_major_axis) / semi_major_axis)
+
+
+def percent_change(series: np.ndarray) -> np.ndarray:
+    """
+    Finds the % change of a series relative to its first value.
+
+    If the first value is 0 there is nothing to compare against, so the series is returned as-is and
+    any deviation should be treated as absolute.
+    :param series: The series, e.g. total energy or angular momentum.
+    :return: % change at each step.
+    """
+    series = np.asarray(series, dtype=float)
+    if series[0] == 0:
+        return series
+    return (series * 100 / series[0]) - 100
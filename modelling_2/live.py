@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Awaitable, Callable
+
+import matplotlib.pyplot as plt
+
+from Body import Body
+from utilities import VerletOutput, integration
+
+
+class Frame(object):
+    """
+    Helper class for a single decimated snapshot of the system, as sent to a live viewer.
+    """
+
+    def __init__(self, step: int, t: float, names: list[str],
+                 xs: list[float], ys: list[float], energy: float) -> None:
+        self.step = step
+        self.t = t
+        self.names = names
+        self.xs = xs
+        self.ys = ys
+        self.energy = energy  # total energy of the whole system at this step
+
+    def to_dict(self) -> dict:
+        return {"step": self.step, "t": self.t, "names": self.names,
+                "x": self.xs, "y": self.ys, "energy": self.energy}
+
+
+class IntegrationCancelled(Exception):
+    """
+    Raised inside the worker thread to abandon an integration once its viewer has failed.
+    """
+
+
+async def stream_integration(bodies: list[Body], end: float, step: float,
+                             three_body: bool, softener: float,
+                             consumer: Callable[[asyncio.Queue], Awaitable[None]],
+                             every: int = 100, queue_size: int = 8) -> VerletOutput:
+    """
+    Runs the Verlet integration in a worker thread, streaming every Nth step to a consumer as it goes.
+
+    The queue is bounded, and if the consumer falls behind the oldest waiting frame is thrown away,
+    so the integration never has to wait on the viewer. A None is queued once the integration is done.
+    The consumer still shares the GIL with the integration, so it should keep its work light (see
+    plot_frames()). If the consumer raises, the integration is stopped at its next frame and the error
+    passed on, rather than only surfacing once the whole integration has run.
+    :param bodies: A list of bodies over which we iterate.
+    :param end: The total time the integration will run for
+    :param step: The timestep over which we integrate
+    :param three_body: Whether we are integrating the three-body solutions
+    :param softener: The softener parameter to apply when bodies are close
+    :param consumer: Coroutine function that reads frames from the queue until it receives None.
+    :param every: Only every Nth step is sent to the consumer.
+    :param queue_size: Maximum number of frames waiting for the consumer.
+    :return: The full VerletOutput, exactly as integration() would return it.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    body_count = len(bodies)
+    names = [str(body.name) for body in bodies]
+    stop = threading.Event()
+    dropped = 0
+
+    def push(frame) -> None:
+        # Always runs on the event loop, so nothing else touches the queue meanwhile.
+        nonlocal dropped
+        if queue.full():
+            queue.get_nowait()
+            dropped += 1
+        queue.put_nowait(frame)
+
+    def on_frame(iteration: int, t: float, output: VerletOutput) -> None:
+        # Runs in the worker thread - build the frame here, then hand it over without waiting.
+        if iteration % every != 0:
+            return
+        if stop.is_set():
+            raise IntegrationCancelled()
+        latest = output.bodies[-body_count:]
+        frame = Frame(iteration, float(t), names,
+                      [float(body.pos.x) for body in latest],
+                      [float(body.pos.y) for body in latest],
+                      float(sum(output.energies[2][-body_count:])))
+        loop.call_soon_threadsafe(push, frame)
+
+    worker = asyncio.ensure_future(asyncio.to_thread(
+        integration, bodies, end, step, three_body, softener, on_frame))
+    worker.add_done_callback(lambda _: push(None))
+    try:
+        await consumer(queue)
+    except BaseException:
+        stop.set()
+        await asyncio.gather(worker, return_exceptions=True)
+        raise
+    output = await worker
+    if dropped:
+        print(f"Live viewer fell behind and skipped {dropped} frames.")
+    return output
+
+
+async def plot_frames(queue: asyncio.Queue, redraw_interval: float = 0.1) -> None:
+    """
+    Consumer that draws body trails and the energy drift as the frames come in.
+    Redrawing is slow and shares the GIL with the integration, so every waiting frame is taken in between
+    redraws, which happen at most once every redraw_interval - and less often if drawing is slow, so that
+    no more than about a tenth of the time goes on drawing.
+    :param queue: The queue of frames from stream_integration().
+    :param redraw_interval: Shortest time between redraws (s)
+    """
+    plt.ion()
+    # Use a named figure so we don't steal any of the numbered figures main() draws later.
+    fig = plt.figure("Live view")
+    ax_pos, ax_e = fig.subplots(2)
+    ax_pos.set_xlabel("x position (m)")
+    ax_pos.set_ylabel("y position (m)")
+    ax_e.set_xlabel("Time (s)")
+    ax_e.set_ylabel("% of total energy")
+    drift_line = ax_e.plot([], [])[0]
+    trails, times, drifts = [], [], []
+    e_0 = None
+    next_draw = 0.0
+    finished = False
+    while not finished:
+        frame = await queue.get()
+        waiting = [frame]
+        while frame is not None and not queue.empty():
+            frame = queue.get_nowait()
+            waiting.append(frame)
+        finished = frame is None
+        for frame in waiting:
+            if frame is None:
+                break
+            if e_0 is None:
+                e_0 = frame.energy
+                trails = [(ax_pos.plot([], [], label=name)[0], [], []) for name in frame.names]
+                ax_pos.legend(loc="upper right")
+            for (line, xs, ys), x, y in zip(trails, frame.xs, frame.ys):
+                xs.append(x)
+                ys.append(y)
+            times.append(frame.t)
+            drifts.append((frame.energy * 100 / e_0) - 100 if e_0 else frame.energy)
+        if not finished and time.monotonic() < next_draw:
+            continue
+        started = time.monotonic()
+        for line, xs, ys in trails:
+            line.set_data(xs, ys)
+        drift_line.set_data(times, drifts)
+        for ax in (ax_pos, ax_e):
+            ax.relim()
+            ax.autoscale_view()
+        fig.canvas.draw_idle()
+        fig.canvas.flush_events()
+        drawn = time.monotonic()
+        next_draw = drawn + max(redraw_interval, 9 * (drawn - started))
+    plt.ioff()
+
+
+def tail_frames(filename: str) -> Callable[[asyncio.Queue], Awaitable[None]]:
+    """
+    Builds a consumer that appends each frame as a line of JSON, for watching with `tail -f`.
+    :param filename: The file to write frames to.
+    :return: Consumer to pass to stream_integration().
+    """
+
+    async def consumer(queue: asyncio.Queue) -> None:
+        with open(filename, "w") as file:
+            while (frame := await queue.get()) is not None:
+                file.write(json.dumps(frame.to_dict()) + "\n")
+                file.flush()
+
+    return consumer
@@ -1,9 +1,12 @@
+import asyncio
 import statistics
 
 import matplotlib.pylab as pylab
 import matplotlib.pyplot as plt
 
 from Body import setup_bodies
+from analysis import percent_change, positions, radius_deviation, totals
+from live import plot_frames, stream_integration, tail_frames
 from utilities import *
 
 # You can find the project's GitHub with commit history at
@@ -86,7 +89,7 @@ system_dict = {
 }
 
 
-def main(setup: str):
+def main(setup: str, live: str = "n"):
     # Read in all relevant values from our dictionary.
     name = setup
     end = system_dict[setup]["end"]
@@ -97,12 +100,21 @@ def main(setup: str):
     # Read in the bodies that we are working with.
     bodies: list[Body] = setup_bodies(f"csvs/{name}.csv")
     body_count = len(bodies)
-    # Run the Verlet integration.
-    verlet = integration(bodies, end, step, three_body, softening_value)
+    # Run the Verlet integration - either straight through, or streamed to a live viewer.
+    if live == "plot":
+        verlet = asyncio.run(stream_integration(bodies, end, step, three_body, softening_value,
+                                                plot_frames))
+    elif live == "file":
+        print(f"Streaming frames to live_{name}.jsonl")
+        verlet = asyncio.run(stream_integration(bodies, end, step, three_body, softening_value,
+                                                tail_frames(f"live_{name}.jsonl")))
+    else:
+        verlet = integration(bodies, end, step, three_body, softening_value)
 
     # Store initial condition for later
-    e_t = get_total_var(verlet.energies[2], body_count)
-    e_0 = e_t.pop(0)
+    e_t = totals(verlet.energies[2], body_count)
+    e_0 = e_t[0]
+    times = np.arange(0, end, step)
 
     # Guess period
     # Could use position for this as well ; less computationally strenous
@@ -113,15 +125,15 @@ def main(setup: str):
     period = 0
     # If no successful guesses, guess more within a threshold percentage
     if not three_body:
+        # Guess over every energy after the initial one
+        e_later = e_t[1:]
         while not periods:
-            # Guess over each index n and energy e
-            for n, e in enumerate(e_t):
-                # Make sure we're not guessing the first 1% of values
-                if (is_within_percentage(e, e_0, guess_percent)
-                        and (n > int(len(e_t) * 0.01))):
-                    # Sinusoidal shape, so we hit the expected value twice.
-                    periods.append(n * step * 2)
-                    break
+            # Make sure we're not guessing the first 1% of values
+            hits = np.flatnonzero(is_within_percentage(e_later, e_0, guess_percent))
+            hits = hits[hits > int(len(e_later) * 0.01)]
+            if hits.size:
+                # Sinusoidal shape, so we hit the expected value twice.
+                periods.append(int(hits[0]) * step * 2)
             if guess_percent > 1:
                 # If we didn't find any over a 100% threshold, things are clearly broken...
                 print("Could not guess!")
@@ -144,9 +156,8 @@ def main(setup: str):
             print(f"% uncertainty: {float(error * 100 / period)}")
             line_text()
 
-    # Extract lists of the X- and Y- coordinates from each body.
-    x_list = list(map(lambda body: float(body.pos.x), verlet.bodies))
-    y_list = list(map(lambda body: float(body.pos.y), verlet.bodies))
+    # Extract (steps, N) arrays of the X- and Y- coordinates of each body.
+    x_steps, y_steps = positions(verlet, body_count)
 
     # Now time to validate Kepler's 3rd law
     semi_major_axis: float = 0
@@ -155,34 +166,24 @@ def main(setup: str):
         # Use Kepler's 3rd law to find a period
         semi_major_axis = np.pow((6.67E-11 * (bodies[0].mass + bodies[1].mass) * (period ** 2))
                                  / (4 * (np.pi ** 2)), 1 / 3)
-        # Now calculate the absolute deviation from the predicted semi-major axis from the x- and
+        # Now calculate the deviation from the predicted semi-major axis from the x- and
         # y- coordinates we just found.
-        radius_list = []
         # Only use the orbit of the main object in our CSVs - should be index 1.
         # Please view template.csv for more information.
-        central_orbit_x = split_list(x_list, 1, body_count)
-        central_orbit_y = split_list(y_list, 1, body_count)
-        for n in range(len(central_orbit_x)):
-            # Calculate the deviations from the expected semi-major axis for each value
-            orbital_radius = np.sqrt((central_orbit_x[n] ** 2) + (central_orbit_y[n] ** 2))
-            radius_list.append(100 * ((orbital_radius - semi_major_axis) / semi_major_axis))
+        radius_list = radius_deviation(x_steps[:, 1], y_steps[:, 1], semi_major_axis)
         # And then graph the deviation.
         # noinspection PyUnusedLocal
         funny_plot = plt.figure(0)
-        plt.plot(np.arange(0, end, step).tolist(), radius_list)
+        plt.plot(times, radius_list)
         plt.xlabel("Time (s)")
         plt.ylabel("Deviation from semi-major axis")
         line_text()
 
-    # Put the initial energy back where it belongs.
-    e_t.insert(0, e_0)
-
     # Plot positions
     # noinspection PyUnusedLocal
     pos_plot = plt.figure(1)
     for i in range(body_count):
-        plt.plot(split_list(x_list, i, body_count),
-                 split_list(y_list, i, body_count),
+        plt.plot(x_steps[:, i], y_steps[:, i],
                  label=verlet.bodies[i].name)
     # Only used if we found a semi-major axis!
     if semi_major_axis != 0:
@@ -194,29 +195,26 @@ def main(setup: str):
 
     # Plot energies
     energy_plot, ax = plt.subplots(2)
-    ax[0].plot(np.arange(0, end, step).tolist(), e_t)
+    ax[0].plot(times, e_t)
     # Map the change in energy.
-    d_e = list(map(lambda e_map: (e_map * 100 / e_0) - 100, e_t))
+    d_e = percent_change(e_t)
     if periods and period and not three_body:
         ax[0].vlines(period, np.max(e_t), np.min(e_t), linestyles="dashed")
         ax[1].vlines(period, np.max(d_e), np.min(d_e), linestyles="dashed")
     ax[0].set_ylabel("Total energy (J)")
-    ax[1].plot(np.arange(0, end, step).tolist(), d_e)
+    ax[1].plot(times, d_e)
     ax[1].set_xlabel("Time (s)")
     ax[1].set_ylabel("% of total energy")
 
     # Plot angular momentum
     # noinspection PyUnusedLocal
     am_plot = plt.figure(3)
-    ams = get_total_var(verlet.ams, body_count)
+    ams = totals(verlet.ams, body_count)
     am_0 = ams[0]
-    # Make sure no division by zero - if initial angular momentum is 0, then any deviation
-    # can just be treated as ABSOLUTE.
-    if am_0 == 0:
-        d_ams = ams
-    else:
-        d_ams = list(map(lambda am: (am * 100 / am_0) - 100, ams))
-    plt.plot(np.arange(0, end, step).tolist(), d_ams)
+    # percent_change() makes sure there's no division by zero - if initial angular momentum is 0,
+    # then any deviation is just treated as ABSOLUTE.
+    d_ams = percent_change(ams)
+    plt.plot(times, d_ams)
     plt.xlabel("Time (s)")
     plt.ylabel("Change in angular momentum (%) (kgm^2s^-1)")
     plt.show()
@@ -250,5 +248,8 @@ while True:
             print("Not found in dictionary, please try again")
     except ValueError:
         print("That isn't a string, please try again")
+# Ask whether they want to watch the integration as it runs
+live_mode = str(input("Watch the integration live? (plot/file/n)\n"))
+line_text()
 # ... and run the main code.
-main(system)
+main(system, live_mode)
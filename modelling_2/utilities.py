@@ -1,4 +1,5 @@
 from copy import deepcopy
+from typing import Callable
 
 import numpy as np
 from alive_progress import alive_bar
@@ -19,7 +20,8 @@ class VerletOutput(object):
 
 
 def integration(bodies: list[Body], end: float, step: float,
-                three_body: bool, softener: float) -> VerletOutput:
+                three_body: bool, softener: float,
+                on_frame: Callable[[int, float, VerletOutput], None] = None) -> VerletOutput:
     """
     Performs Verlet integration over our system.
     :param bodies: A list of bodies over which we iterate.
@@ -27,6 +29,7 @@ def integration(bodies: list[Body], end: float, step: float,
     :param step: The timestep over which we integrate
     :param three_body: Whether we are integrating the three-body solutions (and thus need to equate G = 1)
     :param softener: The softener parameter to apply when bodies are close
+    :param on_frame: Optional hook called after every step with the step number, time and output so far.
     :return: An array of the Body values involved
     """
     # Time to 0.
@@ -78,6 +81,9 @@ def integration(bodies: list[Body], end: float, step: float,
                 output.energies[1].append(gpe)
                 output.energies[2].append(ke + (gpe / 2))
                 output.ams.append(am)
+            # Let any live viewer know a full step has been recorded.
+            if on_frame is not None:
+                on_frame(iterations, t, output)
             t += step
             iterations += 1
             # Goodbye, floating point error
@@ -88,24 +94,6 @@ def integration(bodies: list[Body], end: float, step: float,
     return output
 
 
-def split_list(target_list: list, offset: int, split: int) -> list:
-    """
-    Splits a list into a new single list that picks from every N values [from the original list].
-    :param target_list: The list to apply this operation to.
-    :param offset: The index to start at when splitting.
-    :param split: The number of values to split into.
-    :return:
-    """
-    # Create a new separate list
-    return_list = target_list.copy()
-    # If offset is 0, we don't need to pop our original values
-    if offset != 0:
-        for i in range(offset):
-            return_list.pop(0)
-    # Now grab the remaining values
-    return return_list[::split]
-
-
 def get_decimal_places(value: float) -> int:
     """
     Returns the number of decimal places of a floating point number.
@@ -134,30 +122,10 @@ def centre_of_mass(bodies: list[Body]) -> Vector2D:
     return pos
 
 
-def get_total_var(body_list: list, body_n: int) -> list:
-    """
-    Finds the total of a variable of a list.
-    :param body_n: Number of bodies in the list
-    :param body_list: The list to handle
-    :return: Total sum of the variable.
-    """
-    params = []
-    final_vars = []
-    # Make a list of each
-    for i in range(body_n):
-        params.append(split_list(body_list, i, body_n))
-    for i in range(len(params[0])):
-        var = 0
-        for j in range(body_n):
-            var += params[j][i]
-        final_vars.append(var)
-    return final_vars
-
-
 def is_within_percentage(n_1: float, n_2: float, percentage: float) -> bool:
     """
     Returns whether one number is within a % value of another number.
-    :param n_1: The number we are comparing against
+    :param n_1: The number (or array of numbers) we are comparing against
     :param n_2: The number we are going to compare
     :param percentage: A percentage, out of 100.
     :return: 1 if the conditions are met.
@@ -165,10 +133,11 @@ def is_within_percentage(n_1: float, n_2: float, percentage: float) -> bool:
     decimal = percentage / 200.0
     top = n_2 * (1.0 + decimal)
     bottom = n_2 * (1.0 - decimal)
+    # Use & rather than `and` so n_1 can also be a whole array of numbers.
     if n_2 <= 0:
-        return (top <= n_1) and (n_1 <= bottom)
+        return (top <= n_1) & (n_1 <= bottom)
     else:
-        return (bottom <= n_1) and (n_1 <= top)
+        return (bottom <= n_1) & (n_1 <= top)
 
 
 def cool_text() -> None:
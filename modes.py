@@ -0,0 +1,109 @@
+import numpy as np
+
+from chain import chain_matrix, tridiagonal_eigenvalues, tridiagonal_eigenvectors
+from eigensolver import get_eigenvalues_general, get_eigenvectors
+
+# Once the normal modes of a coupled oscillator are known, its motion is just a sum of independent
+# oscillations - x(t) = sum over modes of v_j (a_j cos(w_j t) + b_j sin(w_j t) / w_j) - so it can be
+# evaluated at any times directly, with no time-stepping.
+
+
+class ModalSolution(object):
+    """
+    Helper class holding the normal-mode decomposition of a coupled oscillator's motion.
+    """
+
+    def __init__(self, frequencies, modes, displacements, velocities) -> None:
+        self.frequencies = frequencies  # angular frequency of each mode (rad s^-1)
+        self.modes = modes  # (n, K) matrix, one column of mass displacements per mode
+        self.displacements = displacements  # initial displacement along each mode, a_j
+        self.velocities = velocities  # initial velocity along each mode, b_j
+
+    def evaluate(self, times, chunk_size: int = 2 ** 22):
+        """
+        Evaluates the displacement of every mass at the given times in closed form.
+        :param times: 1D array of times (s)
+        :param chunk_size: Rough cap on the (modes x times) elements worked on at once, to bound memory
+        :return: Array with one row per time and one column per mass, like analysis.columns()
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        omega = self.frequencies[:, None]
+        # sin(w t) / w tends to t as w -> 0, which covers a free chain's rigid-body mode
+        moving = omega != 0
+        safe_omega = np.where(moving, omega, 1.0)
+        output = np.empty((len(times), len(self.modes)))
+        step = max(1, chunk_size // max(len(self.frequencies), 1))
+        for start in range(0, len(times), step):
+            phase = omega * times[None, start:start + step]
+            sines = np.sin(phase) / safe_omega
+            if not moving.all():
+                sines = np.where(moving, sines, times[None, start:start + step])
+            coefficients = self.displacements[:, None] * np.cos(phase) + self.velocities[:, None] * sines
+            output[start:start + step] = (self.modes @ coefficients).T
+        return output
+
+
+def _check_modes(modes, displacements, velocities, x_0, v_0) -> None:
+    """
+    Raises a RuntimeError unless the modes and amplitudes rebuild the initial state, i.e. x(0) and v(0).
+    """
+    for name, start, amplitudes in (("displacement", x_0, displacements), ("velocity", v_0, velocities)):
+        start = np.asarray(start, dtype=float)
+        if not np.allclose(modes @ amplitudes, start, rtol=1e-8, atol=1e-8 * np.abs(start).max(initial=0.0)):
+            raise RuntimeError(f"Normal modes don't reproduce the initial {name} - eigenvectors are inaccurate")
+
+
+def modal_solution(target_matrix, x_0, v_0) -> ModalSolution:
+    """
+    Decomposes the motion x'' = A x into normal modes, for a dynamical matrix A such as harmonic_matrix().
+    :param target_matrix: The dynamical matrix A
+    :param x_0: Initial displacement of each mass (m)
+    :param v_0: Initial velocity of each mass (ms^-1)
+    :return: The ModalSolution, ready to evaluate
+    :raises ValueError: If A isn't oscillatory, or is defective (fewer independent modes than masses)
+    """
+    eigenvalues = get_eigenvalues_general(target_matrix)
+    # A zero (rigid-body) mode can come out a round-off's width above zero, so allow for that
+    zero = 1e-12 * (np.linalg.norm(target_matrix) or 1.0)
+    if np.iscomplexobj(eigenvalues) or np.any(eigenvalues > zero):
+        raise ValueError("Matrix has eigenvalues that aren't -omega^2, so its motion isn't oscillatory")
+    # The modes needn't be orthogonal for a non-symmetric A, so solve for the amplitudes.
+    # Both steps fail when a repeated eigenvalue has too few eigenvectors to go round.
+    try:
+        modes = get_eigenvectors(target_matrix, eigenvalues)
+        displacements = np.linalg.solve(modes, np.asarray(x_0, dtype=float))
+        velocities = np.linalg.solve(modes, np.asarray(v_0, dtype=float))
+    except (np.linalg.LinAlgError, RuntimeError):
+        raise ValueError("Matrix doesn't have a full set of normal modes (it is defective)") from None
+    _check_modes(modes, displacements, velocities, x_0, v_0)
+    # Clip that round-off, as for a free chain, so the zero mode gets omega = 0
+    return ModalSolution(np.sqrt(np.clip(-eigenvalues, 0.0, None)), modes, displacements, velocities)
+
+
+def chain_modal_solution(x_0, v_0, masses, springs=1.0, ends="fixed") -> ModalSolution:
+    """
+    Decomposes the motion of a chain of masses into normal modes (see chain_matrix() for the chain parameters).
+    Works on the symmetric form of the chain's matrix, whose eigenvectors are orthonormal, so projecting
+    onto the modes is a matrix product rather than a solve.
+    :param x_0: Initial displacement of each mass (m)
+    :param v_0: Initial velocity of each mass (ms^-1)
+    :param masses: The N masses along the chain (kg)
+    :param springs: Spring constant(s) (Nm-1)
+    :param ends: "fixed" or "free", or a (left, right) pair of those
+    :return: The ModalSolution, ready to evaluate
+    :raises RuntimeError: If the modes found don't reproduce x_0 and v_0
+    """
+    masses = np.atleast_1d(np.asarray(masses, dtype=float))
+    diagonal, off_diagonal = chain_matrix(masses, springs, ends)
+    eigenvalues = tridiagonal_eigenvalues(diagonal, off_diagonal)
+    vectors = tridiagonal_eigenvectors(diagonal, off_diagonal, eigenvalues)
+    # Symmetric form works in y = M^(1/2) x, so convert on the way in and out
+    root_masses = np.sqrt(masses)
+    displacements = vectors.T @ (root_masses * np.asarray(x_0, dtype=float))
+    velocities = vectors.T @ (root_masses * np.asarray(v_0, dtype=float))
+    modes = vectors / root_masses[:, None]
+    # Projecting only works if the modes really are orthonormal
+    _check_modes(modes, displacements, velocities, x_0, v_0)
+    # Clip the tiny positive round-off a free chain's zero mode can pick up
+    frequencies = np.sqrt(np.clip(-eigenvalues, 0.0, None))
+    return ModalSolution(frequencies, modes, displacements, velocities)
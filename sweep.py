@@ -0,0 +1,97 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from eigensolver import harmonic_matrices, solve_eigenvalues_batched
+
+# Maps the coupled-oscillator frequencies over a grid of (m_1, m_2, k), e.g. a 1000 x 1000 mass grid:
+#   python sweep.py --m1 0.1 20 1000 --m2 0.1 20 1000 --k 3 3 1 --out frequencies.csv
+# The grid is split into chunks that are solved across a process pool and written to disk as they finish,
+# so the whole grid never has to be held in memory.
+
+HEADER = "m_1,m_2,k,f_1,f_2"
+
+
+def solve_chunk(m_1_values, m_2_values, k_values, start: int, stop: int, tolerance: float,
+                max_iterations: int):
+    """
+    Solves one chunk of the flattened parameter grid.
+    :param m_1_values: Values of the first mass along the grid
+    :param m_2_values: Values of the second mass along the grid
+    :param k_values: Values of the spring constant along the grid
+    :param start: First flat grid index in this chunk
+    :param stop: One past the last flat grid index in this chunk
+    :param tolerance: Residual at which to stop the QU algorithm.
+    :param max_iterations: Give up after this many iterations.
+    :return: Array of rows (m_1, m_2, k, f_1, f_2), the worst residual in the chunk and whether it converged
+    """
+    i, j, l = np.unravel_index(np.arange(start, stop), (len(m_1_values), len(m_2_values), len(k_values)))
+    m_1, m_2, k = m_1_values[i], m_2_values[j], k_values[l]
+    result = solve_eigenvalues_batched(harmonic_matrices(m_1, m_2, k), tolerance, max_iterations)
+    # Eigenvalues are -omega^2 - sort so f_1 is always the lower frequency
+    frequencies = np.sort(np.sqrt(-result.eigenvalues), axis=1)
+    return np.column_stack((m_1, m_2, k, frequencies)), result.residual, result.converged
+
+
+def sweep(m_1_values, m_2_values, k_values, filename: str, chunk_size: int = 100_000,
+          workers: int = None, tolerance: float = 1e-10, max_iterations: int = 10_000) -> tuple[float, bool]:
+    """
+    Evaluates the eigenfrequencies over every combination of the given parameters, streaming the
+    results to a CSV file in grid order (m_1 slowest, k fastest).
+    :param m_1_values: Values of the first mass (kg)
+    :param m_2_values: Values of the second mass (kg)
+    :param k_values: Values of the spring constant (Nm-1) - pass a single value for a 2D (m_1, m_2) map
+    :param filename: CSV file to write to
+    :param chunk_size: Number of grid points each worker solves at a time
+    :param workers: Number of worker processes (defaults to the number of CPUs)
+    :param tolerance: Residual at which to stop the QU algorithm.
+    :param max_iterations: Give up after this many iterations.
+    :return: The worst residual over the whole grid, and whether every chunk converged
+    """
+    m_1_values, m_2_values, k_values = (np.atleast_1d(np.asarray(values, dtype=float))
+                                        for values in (m_1_values, m_2_values, k_values))
+    total = len(m_1_values) * len(m_2_values) * len(k_values)
+    starts = range(0, total, chunk_size)
+    stops = [min(start + chunk_size, total) for start in starts]
+    worst_residual, converged = 0.0, True
+    with open(filename, "w") as file, ProcessPoolExecutor(max_workers=workers) as executor:
+        file.write(HEADER + "\n")
+        solve = partial(solve_chunk, m_1_values, m_2_values, k_values,
+                        tolerance=tolerance, max_iterations=max_iterations)
+        chunks = executor.map(solve, starts, stops)
+        # map() hands the chunks back in order, so rows land in grid order
+        for done, (rows, residual, chunk_converged) in enumerate(chunks, 1):
+            np.savetxt(file, rows, delimiter=",", fmt="%.10g")
+            # np.fmax would skip NaNs - we want them to show up
+            worst_residual = residual if np.isnan(residual) else max(worst_residual, residual)
+            converged = converged and chunk_converged
+            print(f"Chunk {done}/{len(stops)} written")
+    return worst_residual, converged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep coupled-oscillator frequencies over a parameter grid.")
+    parser.add_argument("--m1", type=float, nargs=3, metavar=("START", "STOP", "NUM"), default=[0.1, 20.0, 100],
+                        help="first mass grid, as for np.linspace")
+    parser.add_argument("--m2", type=float, nargs=3, metavar=("START", "STOP", "NUM"), default=[0.1, 20.0, 100],
+                        help="second mass grid, as for np.linspace")
+    parser.add_argument("--k", type=float, nargs=3, metavar=("START", "STOP", "NUM"), default=[1.0, 1.0, 1],
+                        help="spring constant grid, as for np.linspace")
+    parser.add_argument("--out", default="frequencies.csv", help="CSV file to write to")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--tolerance", type=float, default=1e-10)
+    args = parser.parse_args()
+
+    grids = [np.linspace(start, stop, int(num)) for start, stop, num in (args.m1, args.m2, args.k)]
+    residual, converged = sweep(*grids, args.out, args.chunk_size, args.workers, args.tolerance)
+    print(f"Wrote {args.out} (worst residual {residual:.3g})")
+    if not converged:
+        print("WARNING: some grid points did not converge - check the frequencies before using them")
+
+
+if __name__ == "__main__":
+    main()